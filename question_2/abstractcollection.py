@@ -12,8 +12,13 @@ class AbstractCollection(object):
         contents of sourceCollection, if it's present."""
         self._size = 0
         if sourceCollection:
-            for item in sourceCollection:
-                self.add(item)
+            self._load(sourceCollection)
+
+    def _load(self, sourceCollection):
+        """Adds the items of sourceCollection to self. Subclasses
+        may override this to build themselves in bulk."""
+        for item in sourceCollection:
+            self.add(item)
 
     # Accessor methods
     def isEmpty(self):
@@ -0,0 +1,271 @@
+"""
+File: arraybst.py
+Author: Vladyslav Protsenko
+"""
+
+from array import array
+from itertools import islice
+from abstractcollection import AbstractCollection
+from linkedbst_1 import _checked, _is_sorted
+
+# Index used in place of a missing child
+NIL = -1
+
+
+class ArrayBST(AbstractCollection):
+    """An array-backed binary search tree implementation.
+    Instead of node objects, the tree keeps three parallel columns:
+    the keys, and the indices of the left and right children of each
+    slot. Slots freed by remove are recycled by later adds."""
+
+    def __init__(self, sourceCollection=None):
+        """Sets the initial state of self, which includes the
+        contents of sourceCollection, if it's present."""
+        self._keys = []
+        self._left = array("l")
+        self._right = array("l")
+        self._free = []
+        self._root = NIL
+        AbstractCollection.__init__(self, sourceCollection)
+
+    @classmethod
+    def from_sorted(cls, items, count=None):
+        """
+        Returns a new perfectly balanced tree built in linear time
+        from items, which must already be in ascending order.
+        If count is given, only the first count items are taken.
+        The items are read straight into the key column.
+        Raises: ValueError if items are not sorted or there are
+        fewer than count of them.
+        """
+        if count is not None:
+            items = islice(items, count)
+        keys = list(_checked(items))
+        if count is not None and len(keys) < count:
+            raise ValueError("Fewer items than count.")
+        tree = cls()
+        tree._build(keys)
+        return tree
+
+    def _load(self, sourceCollection):
+        """Builds the tree in one pass when sourceCollection is
+        sorted, otherwise adds its items one by one."""
+        items = list(sourceCollection)
+        if self.isEmpty() and _is_sorted(items):
+            self._build(items)
+        else:
+            for item in items:
+                self.add(item)
+
+    # Accessor methods
+    def __iter__(self):
+        """Supports a preorder traversal on a view of self."""
+        left, right = self._left, self._right
+        stack = []
+        if self._root != NIL:
+            stack.append(self._root)
+        while stack:
+            slot = stack.pop()
+            yield self._keys[slot]
+            if right[slot] != NIL:
+                stack.append(right[slot])
+            if left[slot] != NIL:
+                stack.append(left[slot])
+
+    def inorder(self):
+        """Supports an inorder traversal on a view of self."""
+        keys, left, right = self._keys, self._left, self._right
+        stack = []
+        slot = self._root
+        while slot != NIL or stack:
+            while slot != NIL:
+                stack.append(slot)
+                slot = left[slot]
+            slot = stack.pop()
+            yield keys[slot]
+            slot = right[slot]
+
+    def __contains__(self, item):
+        """Returns True if target is found or False otherwise."""
+        return self._locate(item) != NIL
+
+    def find(self, item):
+        """If item matches an item in self, returns the
+        matched item, or None otherwise."""
+        slot = self._locate(item)
+        if slot == NIL:
+            return None
+        return self._keys[slot]
+
+    def range_find(self, low, high):
+        """
+        Returns a list of the items in the tree, where low <= item <= high.
+        """
+        return list(self.range_iter(low, high))
+
+    def range_iter(self, low, high):
+        """
+        Lazily yields, in ascending order, the items where
+        low <= item <= high, visiting only the subtrees that can
+        intersect the range.
+        """
+        keys, left, right = self._keys, self._left, self._right
+        stack = []
+
+        def push_left(slot):
+            while slot != NIL:
+                if keys[slot] >= low:
+                    stack.append(slot)
+                    slot = left[slot]
+                else:
+                    slot = right[slot]
+
+        push_left(self._root)
+        while stack:
+            slot = stack.pop()
+            if keys[slot] > high:
+                return
+            yield keys[slot]
+            push_left(right[slot])
+
+    # Mutator methods
+    def clear(self):
+        """Makes self become empty."""
+        self._keys = []
+        self._left = array("l")
+        self._right = array("l")
+        self._free = []
+        self._root = NIL
+        self._size = 0
+
+    def add(self, item):
+        """Adds item to the tree."""
+        new_slot = self._allocate(item)
+        self._size += 1
+        if self._root == NIL:
+            self._root = new_slot
+            return
+        keys, left, right = self._keys, self._left, self._right
+        slot = self._root
+        while True:
+            if item < keys[slot]:
+                if left[slot] == NIL:
+                    left[slot] = new_slot
+                    return
+                slot = left[slot]
+            else:
+                if right[slot] == NIL:
+                    right[slot] = new_slot
+                    return
+                slot = right[slot]
+
+    def remove(self, item):
+        """Precondition: item is in self.
+        Raises: KeyError if item is not in self.
+        postcondition: item is removed from self."""
+        keys, left, right = self._keys, self._left, self._right
+        parent = NIL
+        slot = self._root
+        while slot != NIL and keys[slot] != item:
+            parent = slot
+            if keys[slot] > item:
+                slot = left[slot]
+            else:
+                slot = right[slot]
+        if slot == NIL:
+            raise KeyError("Item not in tree.")
+        item_removed = keys[slot]
+
+        if left[slot] != NIL and right[slot] != NIL:
+            # Replace the slot's key with the maximum key in the left
+            # subtree and unlink the slot that held that maximum
+            top = slot
+            parent = slot
+            slot = left[slot]
+            while right[slot] != NIL:
+                parent = slot
+                slot = right[slot]
+            keys[top] = keys[slot]
+            new_child = left[slot]
+        elif left[slot] == NIL:
+            new_child = right[slot]
+        else:
+            new_child = left[slot]
+
+        if parent == NIL:
+            self._root = new_child
+        elif left[parent] == slot:
+            left[parent] = new_child
+        else:
+            right[parent] = new_child
+        self._release(slot)
+        self._size -= 1
+        return item_removed
+
+    def rebalance(self):
+        """
+        Rebalances the tree, compacting the columns as well.
+        """
+        self._build(list(self.inorder()))
+        return self
+
+    # Helper methods
+    def _locate(self, item):
+        """Returns the slot holding item, or NIL if it is absent."""
+        keys, left, right = self._keys, self._left, self._right
+        slot = self._root
+        while slot != NIL:
+            key = keys[slot]
+            if item == key:
+                return slot
+            elif item < key:
+                slot = left[slot]
+            else:
+                slot = right[slot]
+        return NIL
+
+    def _allocate(self, item):
+        """Stores item in a free slot and returns its index."""
+        if self._free:
+            slot = self._free.pop()
+            self._keys[slot] = item
+            self._left[slot] = NIL
+            self._right[slot] = NIL
+            return slot
+        self._keys.append(item)
+        self._left.append(NIL)
+        self._right.append(NIL)
+        return len(self._keys) - 1
+
+    def _release(self, slot):
+        """Puts slot on the free list."""
+        self._keys[slot] = None
+        self._free.append(slot)
+
+    def _build(self, items):
+        """
+        Replaces the contents of self with a perfectly balanced tree
+        of the sorted list items. The keys are stored in sorted order,
+        so slot i holds the i-th smallest item.
+        """
+        size = len(items)
+        left = array("l", [NIL]) * size
+        right = array("l", [NIL]) * size
+
+        def recurse(low, high):
+            """
+            Links the subtree of items[low:high] and returns its root.
+            """
+            if low >= high:
+                return NIL
+            middle = (low + high) // 2
+            left[middle] = recurse(low, middle)
+            right[middle] = recurse(middle + 1, high)
+            return middle
+
+        self._keys = items
+        self._left = left
+        self._right = right
+        self._free = []
+        self._root = recurse(0, size)
+        self._size = size
@@ -0,0 +1,242 @@
+"""
+File: benchmark.py
+Author: Vladyslav Protsenko
+
+Reproducible benchmark of the binary search tree variants.
+Every workload is generated from a seeded random generator, every
+operation is timed with time.perf_counter over several runs and the
+peak memory of one extra run is measured with tracemalloc. The results
+are printed (or written) as JSON so they can be compared across runs.
+
+Usage: python benchmark.py [--sizes 1000,10000,all] [--output out.json]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from math import ceil
+
+from arraybst import ArrayBST
+from linkedavl import LinkedAVL
+from linkedbst_1 import LinkedBST
+from wordloader import iter_words
+
+VARIANTS = {
+    "LinkedBST": LinkedBST,
+    "LinkedAVL": LinkedAVL,
+    "ArrayBST": ArrayBST,
+}
+
+# Variants whose height does not depend on the insertion order
+BALANCED = ("LinkedAVL",)
+
+ORDERS = ("sorted", "random", "nearly_sorted")
+
+OPERATIONS = ("add", "find_hit", "find_miss", "find_many", "remove",
+              "range_find", "successor", "rebalance", "bulk_load")
+
+
+def file_read(path):
+    """
+    Reads file and returns the list of its words.
+    """
+    return list(iter_words(path))
+
+
+def make_order(words, order, rng):
+    """
+    Returns the sorted list words rearranged into the given
+    insertion order.
+    """
+    items = list(words)
+    if order == "random":
+        rng.shuffle(items)
+    elif order == "nearly_sorted":
+        # Swap about 1% of the items with a random partner
+        for _ in range(max(1, len(items) // 100)):
+            i = rng.randrange(len(items))
+            j = rng.randrange(len(items))
+            items[i], items[j] = items[j], items[i]
+    return items
+
+
+def percentile(values, fraction):
+    """
+    Returns the nearest-rank percentile of values.
+    """
+    ordered = sorted(values)
+    return ordered[max(0, ceil(fraction * len(ordered)) - 1)]
+
+
+def measure(setup, run, repeat):
+    """
+    Times run(setup()) repeat times (setup itself is not timed) and
+    measures the peak memory of one more run with tracemalloc.
+    """
+    times = []
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - start)
+    state = setup()
+    tracemalloc.start()
+    run(state)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "median": statistics.median(times),
+        "p95": percentile(times, 0.95),
+        "min": min(times),
+        "runs": repeat,
+        "peak_memory": peak,
+    }
+
+
+def operations(cls, items, sorted_items, queries, misses, ranges):
+    """
+    Returns a dictionary of (setup, run) pairs, one per operation
+    that cls supports, for a tree of items inserted in order.
+    """
+    def empty():
+        return cls()
+
+    def built():
+        tree = cls()
+        for item in items:
+            tree.add(item)
+        return tree
+
+    def add_all(tree):
+        for item in items:
+            tree.add(item)
+
+    def find_all(keys):
+        def run(tree):
+            for key in keys:
+                tree.find(key)
+        return run
+
+    def remove_all(tree):
+        for key in queries:
+            tree.remove(key)
+
+    def range_all(tree):
+        for low, high in ranges:
+            tree.range_find(low, high)
+
+    def successor_all(tree):
+        for key in queries:
+            tree.successor(key)
+
+    result = {
+        "add": (empty, add_all),
+        "find_hit": (built, find_all(queries)),
+        "find_miss": (built, find_all(misses)),
+        "remove": (built, remove_all),
+        "range_find": (built, range_all),
+        "rebalance": (built, lambda tree: tree.rebalance()),
+        "bulk_load": (lambda: sorted_items, cls),
+    }
+    if hasattr(cls, "successor"):
+        result["successor"] = (built, successor_all)
+    if hasattr(cls, "find_many"):
+        result["find_many"] = (built, lambda tree: tree.find_many(queries))
+    return result
+
+
+def run_benchmark(path, sizes, variants=tuple(VARIANTS), orders=ORDERS,
+                  repeat=5, seed=0, query_count=10000,
+                  degenerate_limit=5000):
+    """
+    Runs the benchmark and returns its results as a dictionary.
+    Unbalanced variants are skipped for non-random orders above
+    degenerate_limit items, where every operation becomes linear.
+    """
+    words = sorted(file_read(path))
+    results = {
+        "config": {
+            "path": path, "sizes": sizes, "variants": list(variants),
+            "orders": list(orders), "repeat": repeat, "seed": seed,
+            "query_count": query_count,
+            "degenerate_limit": degenerate_limit,
+            "python": sys.version.split()[0],
+        },
+        "results": [],
+    }
+    for size in sizes:
+        rng = random.Random(seed)
+        sorted_items = sorted(rng.sample(words, size))
+        queries = rng.sample(sorted_items, min(query_count, size))
+        misses = [word + "~" for word in queries]
+        ranges = []
+        for _ in range(max(1, len(queries) // 100)):
+            low = rng.choice(sorted_items)
+            ranges.append((low, low + "~"))
+        for order in orders:
+            items = make_order(sorted_items, order, random.Random(seed))
+            for name in variants:
+                if name not in BALANCED and order != "random" \
+                        and size > degenerate_limit:
+                    results["results"].append({
+                        "variant": name, "order": order, "size": size,
+                        "skipped": "degenerate tree above degenerate_limit",
+                    })
+                    continue
+                cls = VARIANTS[name]
+                ops = operations(cls, items, sorted_items, queries,
+                                 misses, ranges)
+                for operation in OPERATIONS:
+                    if operation not in ops:
+                        continue
+                    # The bulk load does not depend on the order
+                    if operation == "bulk_load" and order != "sorted":
+                        continue
+                    setup, run = ops[operation]
+                    stats = measure(setup, run, repeat)
+                    stats.update({
+                        "variant": name, "order": order, "size": size,
+                        "operation": operation,
+                    })
+                    results["results"].append(stats)
+    return results
+
+
+def main(argv=None):
+    """
+    Parses the command line, runs the benchmark and emits JSON.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark the binary search tree variants.")
+    parser.add_argument("--path", default="words.txt")
+    parser.add_argument("--sizes", default="1000,10000,100000,all",
+                        help="comma separated sizes, 'all' for the full file")
+    parser.add_argument("--variants", default=",".join(VARIANTS))
+    parser.add_argument("--orders", default=",".join(ORDERS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--queries", type=int, default=10000)
+    parser.add_argument("--degenerate-limit", type=int, default=5000)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    total = sum(1 for _ in iter_words(args.path))
+    sizes = [total if size == "all" else min(int(size), total)
+             for size in args.sizes.split(",")]
+    results = run_benchmark(args.path, sizes, args.variants.split(","),
+                            args.orders.split(","), args.repeat, args.seed,
+                            args.queries, args.degenerate_limit)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,17 @@ Author: Ken Lambert
 class BSTNode(object):
     """Represents a node for a linked binary search tree."""
 
+    # Slots drop the per-instance __dict__, which dominates the memory
+    # of a large tree.
+    __slots__ = ("data", "left", "right", "height", "size")
+
     def __init__(self, data, left = None, right = None):
         self.data = data
         self.left = left
         self.right = right
+        # Height of the subtree rooted at this node (a leaf has height 0).
+        # Kept up to date by the self-balancing trees.
+        self.height = 0
+        # Number of items in the subtree rooted at this node, used for
+        # the order-statistic queries.
+        self.size = 1
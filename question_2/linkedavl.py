@@ -0,0 +1,113 @@
+"""
+File: linkedavl.py
+Author: Vladyslav Protsenko
+"""
+
+from bstnode import BSTNode
+from linkedbst_1 import LinkedBST, _height, _size
+
+
+class LinkedAVL(LinkedBST):
+    """A self-balancing (AVL) link-based binary search tree.
+    The heights of the two subtrees of every node differ by at most
+    one, so the height of the tree stays O(log n) for any order of
+    insertions and removals."""
+
+    def __init__(self, sourceCollection=None):
+        """Sets the initial state of self, which includes the
+        contents of sourceCollection, if it's present."""
+        LinkedBST.__init__(self, sourceCollection)
+
+    # Mutator methods
+    def add(self, item):
+        """Adds item to the tree."""
+        self._root = self._insert(self._root, item)
+        self._size += 1
+
+    def remove(self, item):
+        """Precondition: item is in self.
+        Raises: KeyError if item is not in self.
+        postcondition: item is removed from self."""
+        if not item in self:
+            raise KeyError("Item not in tree.")
+        removed = []
+        self._root = self._delete(self._root, item, removed)
+        self._size -= 1
+        return removed[0]
+
+    # Helper methods
+    def _insert(self, node, item):
+        """Inserts item into the subtree rooted at node and returns
+        the new (rebalanced) root of that subtree."""
+        if node is None:
+            return BSTNode(item)
+        if item < node.data:
+            node.left = self._insert(node.left, item)
+        else:
+            node.right = self._insert(node.right, item)
+        return self._fix(node)
+
+    def _delete(self, node, item, removed):
+        """Deletes item from the subtree rooted at node, appends the
+        removed item to removed and returns the new subtree root."""
+        if item == node.data:
+            removed.append(node.data)
+            if node.left is None:
+                return node.right
+            if node.right is None:
+                return node.left
+            # Replace the node's value with the maximum value in the
+            # left subtree, as LinkedBST.remove does
+            node.left = self._delete_max(node.left, node)
+        elif node.data > item:
+            node.left = self._delete(node.left, item, removed)
+        else:
+            node.right = self._delete(node.right, item, removed)
+        return self._fix(node)
+
+    def _delete_max(self, node, top):
+        """Moves the maximum value of the subtree rooted at node
+        into top and returns the new subtree root."""
+        if node.right is None:
+            top.data = node.data
+            return node.left
+        node.right = self._delete_max(node.right, top)
+        return self._fix(node)
+
+    def _update(self, node):
+        """Recomputes the bookkeeping fields of node from its children."""
+        node.height = 1 + max(_height(node.left), _height(node.right))
+        node.size = 1 + _size(node.left) + _size(node.right)
+
+    def _rotate_left(self, node):
+        """Rotates the subtree rooted at node to the left."""
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        self._update(node)
+        self._update(pivot)
+        return pivot
+
+    def _rotate_right(self, node):
+        """Rotates the subtree rooted at node to the right."""
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        self._update(node)
+        self._update(pivot)
+        return pivot
+
+    def _fix(self, node):
+        """Restores the AVL property at node and returns the root
+        of the resulting subtree."""
+        self._update(node)
+        balance = _height(node.left) - _height(node.right)
+        if balance > 1:
+            if _height(node.left.left) < _height(node.left.right):
+                node.left = self._rotate_left(node.left)
+            return self._rotate_right(node)
+        if balance < -1:
+            if _height(node.right.right) < _height(node.right.left):
+                node.right = self._rotate_right(node.right)
+            return self._rotate_left(node)
+        return node
@@ -6,37 +6,228 @@ Author: Ken Lambert & Vladyslav Protsenko
 from abstractcollection import AbstractCollection
 from bstnode import BSTNode
 from linkedstack import LinkedStack
+from linkedqueue import LinkedQueue
 from math import log, ceil
-import random
-import time
+from bisect import bisect_left, bisect_right
+from heapq import merge
+import mmap
+import os
+import struct
+
+# Snapshot file layout, see LinkedBST.save: a header with the magic
+# bytes, the format version and the number of items, then every item
+# in inorder as its UTF-8 length followed by the UTF-8 bytes
+SNAPSHOT_MAGIC = b"LBST"
+SNAPSHOT_VERSION = 1
+_HEADER = struct.Struct("<4sBQ")
+_LENGTH = struct.Struct("<I")
+
+
+def _is_sorted(items):
+    """Returns True if the sequence items is in ascending order."""
+    for i in range(1, len(items)):
+        if items[i] < items[i - 1]:
+            return False
+    return True
+
+
+def _checked(items):
+    """Yields items, raising ValueError at the first one that is
+    smaller than the item before it."""
+    previous = None
+    first = True
+    for item in items:
+        if not first and item < previous:
+            raise ValueError("Items are not sorted.")
+        yield item
+        previous = item
+        first = False
+
+
+def _read_keys(data, offset, count):
+    """Yields count length-prefixed UTF-8 keys of the buffer data,
+    starting at offset.
+    Raises: ValueError if data ends before the last key."""
+    end = len(data)
+    for _ in range(count):
+        if offset + _LENGTH.size > end:
+            raise ValueError("Snapshot is truncated.")
+        length = _LENGTH.unpack_from(data, offset)[0]
+        offset += _LENGTH.size
+        if offset + length > end:
+            raise ValueError("Snapshot is truncated.")
+        yield data[offset:offset + length].decode("utf-8")
+        offset += length
+
+
+def _sorted_items(collection):
+    """Returns an iterator over the items of collection in ascending
+    order: its inorder traversal if it has one, else its sorted items."""
+    if hasattr(collection, "inorder"):
+        return collection.inorder()
+    return iter(sorted(collection))
+
+
+def _distinct(first, second):
+    """Yields (item, in_first, in_second) for every distinct item of
+    the sorted iterables first and second, in ascending order."""
+    end = object()
+    first = iter(first)
+    second = iter(second)
+    left = next(first, end)
+    right = next(second, end)
+    while left is not end or right is not end:
+        if right is end or (left is not end and left < right):
+            item, in_first, in_second = left, True, False
+        elif left is end or right < left:
+            item, in_first, in_second = right, False, True
+        else:
+            item, in_first, in_second = left, True, True
+        yield item, in_first, in_second
+        while left is not end and left == item:
+            left = next(first, end)
+        while right is not end and right == item:
+            right = next(second, end)
+
+
+def _height(node):
+    """Returns the height of node, or -1 for an empty subtree."""
+    if node is None:
+        return -1
+    return node.height
+
+
+def _update_heights(path):
+    """Recomputes the heights of the nodes on path (listed from the
+    root down) after a change below its last node. Stops early once a
+    height is unchanged, since the ones above it cannot change either."""
+    for node in reversed(path):
+        height = 1 + max(_height(node.left), _height(node.right))
+        if height == node.height:
+            break
+        node.height = height
+
+
+def _size(node):
+    """Returns the number of items in the subtree rooted at node."""
+    if node is None:
+        return 0
+    return node.size
 
 
 class LinkedBST(AbstractCollection):
     """An link-based binary search tree implementation."""
 
-    def __init__(self, sourceCollection=None):
+    def __init__(self, sourceCollection=None, rebalance_factor=None):
         """Sets the initial state of self, which includes the
-        contents of sourceCollection, if it's present."""
+        contents of sourceCollection, if it's present.
+        If rebalance_factor is given, the tree keeps its height
+        within about rebalance_factor * log2(size): an add that goes
+        deeper rebuilds the highest unbalanced subtree on its path
+        (as a scapegoat tree does), in amortized O(log n)."""
         self._root = None
+        self.rebalance_factor = rebalance_factor
         AbstractCollection.__init__(self, sourceCollection)
 
+    @classmethod
+    def from_sorted(cls, items, count=None):
+        """
+        Returns a new perfectly balanced tree built in linear time
+        from items, which must already be in ascending order.
+        If count is given, the first count items are taken straight
+        from the iterable, without collecting them in a list.
+        Raises: ValueError if items are not sorted or there are
+        fewer than count of them.
+        """
+        tree = cls()
+        if count is None:
+            items = list(items)
+            if not _is_sorted(items):
+                raise ValueError("Items are not sorted.")
+            tree._build(items)
+        else:
+            tree._build(_checked(items), count)
+        return tree
+
+    def save(self, path):
+        """
+        Writes the items of self, which must be strings, to a binary
+        snapshot at path that load reads back. The snapshot is written
+        to a temporary file next to path and moved over it only when
+        complete, so a failed save leaves the old file untouched.
+        Raises: TypeError if an item is not a string.
+        """
+        temporary = os.fspath(path) + ".tmp"
+        try:
+            with open(temporary, "wb") as file:
+                file.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION,
+                                        len(self)))
+                for item in self.inorder():
+                    if not isinstance(item, str):
+                        raise TypeError("Only string items can be saved.")
+                    data = item.encode("utf-8")
+                    file.write(_LENGTH.pack(len(data)))
+                    file.write(data)
+            os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """
+        Returns a new perfectly balanced tree with the items of the
+        snapshot at path. The file is memory-mapped and its keys are
+        decoded straight into the bulk build, which is linear and
+        does no comparisons, as the snapshot keeps them in order.
+        Raises: ValueError if the file is not a valid snapshot.
+        """
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size < _HEADER.size:
+                raise ValueError("Not a LinkedBST snapshot.")
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                magic, version, count = _HEADER.unpack_from(data)
+                if magic != SNAPSHOT_MAGIC:
+                    raise ValueError("Not a LinkedBST snapshot.")
+                if version != SNAPSHOT_VERSION:
+                    raise ValueError(
+                        f"Unsupported snapshot version: {version}.")
+                tree = cls()
+                tree._build(_read_keys(data, _HEADER.size, count), count)
+        return tree
+
+    def _load(self, sourceCollection):
+        """Builds the tree in one pass when sourceCollection is
+        sorted, otherwise adds its items one by one."""
+        items = list(sourceCollection)
+        if self.isEmpty() and _is_sorted(items):
+            self._build(items)
+        else:
+            for item in items:
+                self.add(item)
+
     # Accessor methods
     def __str__(self):
         """Returns a string representation with the tree rotated
         90 degrees counterclockwise."""
-
-        def recurse(node, level):
-            output = ""
-            if node != None:
-                output += recurse(node.right, level + 1)
-                output += "| " * level
-                output += str(node.data) + "\n"
-                output += recurse(node.left, level + 1)
-            return output
-
-        return recurse(self._root, 0)
+        lines = []
+        stack = LinkedStack()
+        node, level = self._root, 0
+        while node is not None or not stack.isEmpty():
+            while node is not None:
+                stack.push((node, level))
+                node, level = node.right, level + 1
+            node, level = stack.pop()
+            lines.append("| " * level + str(node.data) + "\n")
+            node, level = node.left, level + 1
+        return "".join(lines)
 
     def __iter__(self):
+        """Supports a preorder traversal on a view of self."""
+        return self.preorder()
+
+    def preorder(self):
         """Supports a preorder traversal on a view of self."""
         if not self.isEmpty():
             stack = LinkedStack()
@@ -49,30 +240,47 @@ class LinkedBST(AbstractCollection):
                 if node.left != None:
                     stack.push(node.left)
 
-    def preorder(self):
-        """Supports a preorder traversal on a view of self."""
-        return None
-
     def inorder(self):
         """Supports an inorder traversal on a view of self."""
-        lyst = list()
-
-        def recurse(node):
-            if node != None:
-                recurse(node.left)
-                lyst.append(node.data)
-                recurse(node.right)
-
-        recurse(self._root)
-        return lyst
+        stack = LinkedStack()
+        node = self._root
+        while node is not None or not stack.isEmpty():
+            while node is not None:
+                stack.push(node)
+                node = node.left
+            node = stack.pop()
+            yield node.data
+            node = node.right
 
     def postorder(self):
         """Supports a postorder traversal on a view of self."""
-        return None
+        stack = LinkedStack()
+        node = self._root
+        last_visited = None
+        while node is not None or not stack.isEmpty():
+            if node is not None:
+                stack.push(node)
+                node = node.left
+            else:
+                top = stack.peek()
+                if top.right is not None and top.right is not last_visited:
+                    node = top.right
+                else:
+                    yield top.data
+                    last_visited = stack.pop()
 
     def levelorder(self):
         """Supports a levelorder traversal on a view of self."""
-        return None
+        if not self.isEmpty():
+            queue = LinkedQueue()
+            queue.add(self._root)
+            while not queue.isEmpty():
+                node = queue.pop()
+                yield node.data
+                if node.left != None:
+                    queue.add(node.left)
+                if node.right != None:
+                    queue.add(node.right)
 
     def __contains__(self, item):
         """Returns True if target is found or False otherwise."""
@@ -92,6 +300,53 @@ class LinkedBST(AbstractCollection):
             else:
                 node = node.right
 
+    def find_many(self, keys):
+        """
+        Returns a list with the result of find for each of keys, in
+        the order of keys. The keys are sorted once and the whole
+        batch walks down the tree together: at every node it is split
+        into the keys that go left, the ones that match and the ones
+        that go right, so shared parts of the paths are walked once.
+        """
+        keys = list(keys)
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        ordered = [keys[index] for index in order]
+        results = [None] * len(keys)
+        stack = []
+        if self._root is not None and keys:
+            stack.append((self._root, 0, len(keys)))
+        while stack:
+            node, low, high = stack.pop()
+            if high - low == 1:
+                # A lone key finishes with a plain descent
+                item = ordered[low]
+                while node is not None:
+                    data = node.data
+                    if item == data:
+                        results[order[low]] = data
+                        break
+                    elif item < data:
+                        node = node.left
+                    else:
+                        node = node.right
+                continue
+            first = bisect_left(ordered, node.data, low, high)
+            last = bisect_right(ordered, node.data, first, high)
+            for position in range(first, last):
+                results[order[position]] = node.data
+            if node.left is not None and low < first:
+                stack.append((node.left, low, first))
+            if node.right is not None and last < high:
+                stack.append((node.right, last, high))
+        return results
+
+    def contains_many(self, keys):
+        """
+        Returns a list that tells for each of keys, in their order,
+        whether it is in self. See find_many.
+        """
+        return [item is not None for item in self.find_many(keys)]
+
     # Mutator methods
     def clear(self):
         """Makes self become empty."""
@@ -106,8 +361,10 @@ class LinkedBST(AbstractCollection):
             tree = self._root
         else:
             tree = self._root
+            path = []
             while True:
-                # print(self._size)
+                tree.size += 1
+                path.append(tree)
                 if item < tree.data:
                     if tree.left == None:
                         tree.left = BSTNode(item)
@@ -121,6 +378,45 @@ class LinkedBST(AbstractCollection):
                     break
                 else:
                     tree = tree.right
+            _update_heights(path)
+            if self.rebalance_factor is not None and \
+                    len(path) > self.rebalance_factor * log(self._size, 2):
+                self._rebuild_scapegoat(path)
+
+    def _rebuild_scapegoat(self, path):
+        """
+        Rebuilds the highest node of path (listed from the root down)
+        whose larger subtree holds more than alpha of its items, where
+        alpha = 2 ** (-1 / rebalance_factor) is the weight balance
+        that keeps the height within rebalance_factor * log2(size).
+        """
+        alpha = 2 ** (-1 / self.rebalance_factor)
+        for index, node in enumerate(path):
+            if max(_size(node.left), _size(node.right)) > alpha * node.size:
+                break
+        else:
+            return
+        root = self._link(self._subtree_items(node), node.size)
+        if index == 0:
+            self._root = root
+        elif path[index - 1].left is node:
+            path[index - 1].left = root
+        else:
+            path[index - 1].right = root
+        _update_heights(path[:index])
+
+    def _subtree_items(self, node):
+        """
+        Yields the items of the subtree rooted at node in inorder.
+        """
+        stack = []
+        while node is not None or stack:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.data
+            node = node.right
 
     def remove(self, item):
         """Precondition: item is in self.
@@ -139,6 +435,8 @@ class LinkedBST(AbstractCollection):
             parent = top
             current_node = top.left
             while not current_node.right == None:
+                current_node.size -= 1
+                path.append(current_node)
                 parent = current_node
                 current_node = current_node.right
             top.data = current_node.data
@@ -150,7 +448,9 @@ class LinkedBST(AbstractCollection):
         # Begin main part of the method
         if self.isEmpty(): return None
 
-        # Attempt to locate the node containing the item
+        # Attempt to locate the node containing the item, remembering
+        # the path to it so the heights can be updated afterwards
+        path = []
         item_removed = None
         pre_root = BSTNode(None)
         pre_root.left = self._root
@@ -161,6 +461,8 @@ class LinkedBST(AbstractCollection):
             if current_node.data == item:
                 item_removed = current_node.data
                 break
+            current_node.size -= 1
+            path.append(current_node)
             parent = current_node
             if current_node.data > item:
                 direction = 'L'
@@ -180,6 +482,8 @@ class LinkedBST(AbstractCollection):
         #         Delete the maximium node in the left subtree
         if not current_node.left == None \
                 and not current_node.right == None:
+            current_node.size -= 1
+            path.append(current_node)
             lift_left_subtree(current_node)
         else:
 
@@ -205,6 +509,7 @@ class LinkedBST(AbstractCollection):
             self._root = None
         else:
             self._root = pre_root.left
+        _update_heights(path)
         return item_removed
 
     def replace(self, item, new_item):
@@ -228,19 +533,7 @@ class LinkedBST(AbstractCollection):
         Return the height of tree
         :return: int
         '''
-        root = self._root
-        def height1(top):
-            '''
-            Helper function
-            :param top:
-            :return:
-            '''
-            if top == None:
-                return -1
-            children = [top.left, top.right]
-            return 1 + max(height1(child) for child in children)
-
-        return height1(root)
+        return _height(self._root)
 
     def is_balanced(self):
         '''
@@ -261,43 +554,165 @@ class LinkedBST(AbstractCollection):
         :param high:
         :return:
         '''
-        nodes = self.inorder()
-        output = []
-        for node in nodes:
-            if node >= low and node <= high:
-                output.append(node)
-        return output
+        return list(self.range_iter(low, high))
+
+    def range_iter(self, low=None, high=None, include_low=True,
+                   include_high=True, limit=None):
+        """
+        Lazily yields, in ascending order, the items between low and
+        high. A bound of None leaves that side open, include_low and
+        include_high choose between closed and half-open bounds and
+        limit caps the number of items yielded. Only the subtrees
+        that can intersect the range are visited, so the cost is
+        O(height + k) for k yielded items.
+        """
+        def above_low(item):
+            if low is None:
+                return True
+            return item > low or (include_low and item == low)
+
+        def below_high(item):
+            if high is None:
+                return True
+            return item < high or (include_high and item == high)
+
+        def push_left(node):
+            while node is not None:
+                if above_low(node.data):
+                    stack.push(node)
+                    node = node.left
+                else:
+                    node = node.right
+
+        if limit is not None and limit <= 0:
+            return
+        count = 0
+        stack = LinkedStack()
+        push_left(self._root)
+        while not stack.isEmpty():
+            node = stack.pop()
+            if not below_high(node.data):
+                return
+            yield node.data
+            count += 1
+            if count == limit:
+                return
+            push_left(node.right)
 
     def rebalance(self):
         '''
         Rebalances the tree.
         :return:
         '''
-        nodes = self.inorder()
-        self.clear()
-        self.counter = 0
-        def recurse(lst):
+        self._build(list(self.inorder()))
+        return self
+
+    def _build(self, items, count=None):
+        """
+        Replaces the contents of self with a perfectly balanced tree
+        of the first count (by default all) of the sorted items.
+        Nodes are linked directly in one in-order pass over items, so
+        the build takes linear time, does no comparisons and works on
+        any iterable.
+        Raises: ValueError if there are fewer than count items.
+        """
+        if count is None:
+            count = len(items)
+        self._root = self._link(items, count)
+        self._size = count
+
+    def _link(self, items, count):
+        """
+        Links the first count of the sorted items into a perfectly
+        balanced subtree and returns its root.
+        Raises: ValueError if there are fewer than count items.
+        """
+        stream = iter(items)
+
+        def recurse(count):
             """
+            Builds the subtree of the next count items and returns
+            its root.
             """
-            self.counter += 1
-            if len(lst) == 1:
-                if self.find(lst[0]) == None:
-                    self.add(lst[0])
-                return
-            elif len(lst) == 0:
-                return
-            else:
-                root = lst[ceil((len(lst)-1) / 2)]
-                self.add(root)
-                first_part = lst[:ceil((len(lst)-1) / 2)]
-                second_part = lst[ceil((len(lst)-1) / 2) + 1:]
-                recurse(first_part)
-                recurse(second_part)
-                return
-        recurse(nodes)
-        print(self.counter)
-        return self
+            if count == 0:
+                return None
+            left = recurse(count // 2)
+            node = BSTNode(next(stream))
+            node.left = left
+            node.right = recurse(count - count // 2 - 1)
+            node.size = count
+            if left is not None:
+                node.height = left.height + 1
+            return node
+
+        try:
+            return recurse(count)
+        except StopIteration:
+            raise ValueError("Fewer items than count.") from None
+
+    # Set operations
+    def merge(self, other):
+        """
+        Returns a new balanced tree with all the items of self and
+        other, duplicates included. The two sorted sequences are
+        merged and bulk-built, so this takes linear time.
+        """
+        return self._combined(merge(self.inorder(), _sorted_items(other)))
+
+    def union(self, other):
+        """
+        Returns a new balanced tree with every distinct item that is
+        in self or in other, in linear time.
+        """
+        return self._combined(item for item, _, _ in
+                              _distinct(self.inorder(), _sorted_items(other)))
 
+    def intersection(self, other):
+        """
+        Returns a new balanced tree with every distinct item that is
+        both in self and in other, in linear time.
+        """
+        return self._combined(
+            item for item, in_self, in_other in
+            _distinct(self.inorder(), _sorted_items(other))
+            if in_self and in_other)
+
+    def difference(self, other):
+        """
+        Returns a new balanced tree with every distinct item of self
+        that is not in other, in linear time.
+        """
+        return self._combined(
+            item for item, in_self, in_other in
+            _distinct(self.inorder(), _sorted_items(other))
+            if in_self and not in_other)
+
+    def __add__(self, other):
+        """Returns a new tree containing the contents
+        of self and other. See merge."""
+        return self.merge(other)
+
+    def __or__(self, other):
+        """Returns the union of self and other."""
+        return self.union(other)
+
+    def __and__(self, other):
+        """Returns the intersection of self and other."""
+        return self.intersection(other)
+
+    def __sub__(self, other):
+        """Returns the difference of self and other."""
+        return self.difference(other)
+
+    def _combined(self, items):
+        """
+        Returns a new tree of the type of self, with the same
+        rebalance_factor, bulk-built from the sorted items.
+        """
+        tree = type(self)()
+        tree.rebalance_factor = self.rebalance_factor
+        tree._build(list(items))
+        return tree
 
     def successor(self, item):
         """
@@ -308,19 +723,14 @@ class LinkedBST(AbstractCollection):
         :return:
         :rtype:
         """
-        param = 0
-        if self.find(item) == None:
-            param = 1
-            self.add(item)
-        nodes = self.inorder()
-        index = nodes.index(item)
-        if index == len(nodes)-1:
-            if param:
-                self.remove(item)
-            return None
-        successor = nodes[index + 1]
-        if param:
-            self.remove(item)
+        successor = None
+        node = self._root
+        while node is not None:
+            if node.data > item:
+                successor = node.data
+                node = node.left
+            else:
+                node = node.right
         return successor
 
     def predecessor(self, item):
@@ -332,108 +742,105 @@ class LinkedBST(AbstractCollection):
         :return:
         :rtype:
         """
-        param = 0
-        if self.find(item) == None:
-            param = 1
-            self.add(item)
-        nodes = self.inorder()
-        index = nodes.index(item)
-        if not index:
-            if param:
-                self.remove(item)
-            return None
-        predecessor = nodes[index - 1]
-        if param:
-            self.remove(item)
+        predecessor = None
+        node = self._root
+        while node is not None:
+            if node.data < item:
+                predecessor = node.data
+                node = node.right
+            else:
+                node = node.left
         return predecessor
-        
-    def demo_bst(self, path):
+
+    def floor(self, item):
         """
-        Demonstration of efficiency binary search tree for the search tasks.
-        :param path:
-        :type path:
-        :return:
-        :rtype:
+        Returns the largest item that is smaller than or equal
+        to item, or None if there is no such item.
         """
-        def file_read(path):
-            """
-            Reads file and returns list.
-            """
-            with open(path, "r", encoding="utf-8") as file:
-                lst = file.readlines()
-            for i in range(len(lst)):
-                lst[i] = lst[i][:-1]
-            return lst
+        floor = None
+        node = self._root
+        while node is not None:
+            if node.data == item:
+                return node.data
+            elif node.data < item:
+                floor = node.data
+                node = node.right
+            else:
+                node = node.left
+        return floor
 
-        def search_time_1(words, lst):
-            """
-            Search time for 1 variant.
-            """
-            start = time.time()
-            for word in words:
-                lst.index(word)
-            end = time.time()
-            return end - start
+    def ceiling(self, item):
+        """
+        Returns the smallest item that is larger than or equal
+        to item, or None if there is no such item.
+        """
+        ceiling = None
+        node = self._root
+        while node is not None:
+            if node.data == item:
+                return node.data
+            elif node.data > item:
+                ceiling = node.data
+                node = node.left
+            else:
+                node = node.right
+        return ceiling
 
-        def search_time_2(words, lst):
-            """
-            Search time for 2 variant.
-            """
-            tree = LinkedBST()
-            for i in range(len(lst)):
-                tree.add(lst[i])
-            start = time.time()
-            for word in words:
-                tree.find(word)
-            end = time.time()
-            return end - start
-
-        def search_time_3(words, lst):
-            """
-            Search time for 3 variant.
-            """
-            tree = LinkedBST()
-            index = random.sample(lst, 10000)
-            for i in range(len(index)):
-                tree.add(index[i])
-            start = time.time()
-            for word in words:
-                tree.find(word)
-            end = time.time()
-            return end - start
-
-        def search_time_4(words, lst):
-            """
-            Search time for 4 variant.
-            """
-            tree = LinkedBST()
-            index = random.sample(lst, 10000)
-            for i in range(len(index)):
-                tree.add(index[i])
-            tree.rebalance()
-            start = time.time()
-            for word in words:
-                tree.find(word)
-            end = time.time()
-            return end - start
-
-        lst = file_read(path)[:20000]
-        words = random.sample(lst, 10000)
-        time_1 = search_time_1(words, lst)
-        time_2 = search_time_2(words, lst)
-        time_3 = search_time_3(words, lst)
-        time_4 = search_time_4(words, lst)
-        print(f"Searching 10000 words in list: {time_1}")
-        print(f"Searching 10000 words in binary tree (worst case): {time_2}")
-        print(f"Searching 10000 words in binary tree (average case): {time_3}")
-        print(f"Searching 10000 words in binary tree (best case): {time_4}")
-    
-if __name__ == "__main__":
-    tree = LinkedBST()
-    # lst = [i for i in range(250000)]
-    # for _ in range(250000):
-    #     lol = random.choices(lst, k=1)
-    #     tree.add(lol)
-    # print("Starting balancing the tree")
-    # tree.rebalance()
-    tree.demo_bst("words.txt")
\ No newline at end of file
+    def rank(self, item):
+        """
+        Returns the number of items in the tree that are
+        smaller than item.
+        """
+        return self._count_below(item, False)
+
+    def select(self, index):
+        """
+        Returns the item at position index of the sorted order
+        of the tree (counting from 0).
+        Raises: IndexError if index is out of range.
+        """
+        if index < 0 or index >= len(self):
+            raise IndexError("Tree index out of range.")
+        node = self._root
+        while True:
+            left_size = _size(node.left)
+            if index < left_size:
+                node = node.left
+            elif index == left_size:
+                return node.data
+            else:
+                index -= left_size + 1
+                node = node.right
+
+    def count_range(self, low, high):
+        """
+        Returns the number of items in the tree, where
+        low <= item <= high.
+        """
+        if high < low:
+            return 0
+        return self._count_below(high, True) - self._count_below(low, False)
+
+    def __getitem__(self, index):
+        """
+        Returns the item at position index of the sorted order,
+        supporting negative indices like a list.
+        """
+        if index < 0:
+            index += len(self)
+        return self.select(index)
+
+    def _count_below(self, item, inclusive):
+        """
+        Returns the number of items smaller than item (or smaller
+        than or equal to it when inclusive is True) in one descent.
+        """
+        count = 0
+        node = self._root
+        while node is not None:
+            if node.data < item or (inclusive and node.data == item):
+                count += _size(node.left) + 1
+                node = node.right
+            else:
+                node = node.left
+        return count
@@ -3,6 +3,8 @@
 class Node:
     """
     """
+    __slots__ = ("data", "next")
+
     def __init__(self, data, next = None):
         """
         Instantiates a Node with default next of None
@@ -13,6 +15,8 @@ class Node:
 class TwoWayNode(Node):
     """
     """
+    __slots__ = ("previous",)
+
     def __init__(self, data, previous = None, next = None):
         Node.__init__(self, data, next)
         self.previous = previous
@@ -24,6 +28,10 @@ class TW_linked_list:
         self.head = head
         self.tail = tail
 
+    def isEmpty(self):
+        """Returns True if the list has no nodes."""
+        return self.head is None
+
     def add(self, node):
         if self.tail == None:
             self.head = node
@@ -34,11 +42,7 @@ class TW_linked_list:
             self.tail = node
 
     def __iter__(self):
-        if not self.isEmpty():
-            stack = LinkedStack()
-            stack.push(self.head)
-            while not stack.isEmpty():
-                node = stack.pop()
-                yield node.data
-                if node.right != None:
-                    stack.push(node.right)
\ No newline at end of file
+        probe = self.head
+        while probe is not None:
+            yield probe.data
+            probe = probe.next
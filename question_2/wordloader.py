@@ -0,0 +1,84 @@
+"""
+File: wordloader.py
+Author: Vladyslav Protsenko
+
+Streaming loader for word lists. The file is memory-mapped and its
+words are decoded one at a time, so a dictionary of any length can be
+fed into a tree without reading it into a list first.
+"""
+
+import mmap
+import os
+from itertools import islice
+
+from linkedbst_1 import LinkedBST
+
+
+def iter_words(path, dedup=False, min_length=None, max_length=None,
+               encoding="utf-8"):
+    """
+    Yields the words of the file at path, one per line, stripped of
+    surrounding whitespace. Blank lines are skipped. With dedup only
+    the first occurrence of each word is yielded (the words seen so far
+    are kept in a set); min_length and max_length drop the words that
+    are shorter or longer than that.
+    """
+    seen = set() if dedup else None
+    with open(path, "rb") as file:
+        # mmap cannot map an empty file
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for line in iter(data.readline, b""):
+                line = line.strip()
+                if not line:
+                    continue
+                word = line.decode(encoding)
+                if min_length is not None and len(word) < min_length:
+                    continue
+                if max_length is not None and len(word) > max_length:
+                    continue
+                if seen is not None:
+                    if word in seen:
+                        continue
+                    seen.add(word)
+                yield word
+
+
+def batches(words, size):
+    """
+    Yields the items of the iterable words in lists of size items
+    (the last list may be shorter).
+    """
+    if size < 1:
+        raise ValueError("Batch size must be positive.")
+    words = iter(words)
+    batch = list(islice(words, size))
+    while batch:
+        yield batch
+        batch = list(islice(words, size))
+
+
+def load_tree(path, cls=LinkedBST, **options):
+    """
+    Returns a balanced tree of class cls with the words of the file
+    at path; options are passed on to iter_words. A first pass counts
+    the words and checks their order. Sorted words are then streamed
+    straight into the bulk build of cls.from_sorted, without a list.
+    Other word lists (words.txt itself is sorted ignoring case) are
+    sorted once in memory and then bulk-built, so loading stays
+    O(n log n) instead of degenerating into a linked list of adds.
+    """
+    count = 0
+    ordered = True
+    previous = None
+    for word in iter_words(path, **options):
+        if previous is not None and word < previous:
+            ordered = False
+            break
+        previous = word
+        count += 1
+    if ordered:
+        return cls.from_sorted(iter_words(path, **options), count)
+    words = sorted(iter_words(path, **options))
+    return cls.from_sorted(words, len(words))
@@ -4,35 +4,220 @@ This module contains ADT Board.
 
 from btree import LinkedBinaryTree
 from btnode import BSTNode
-from copy import deepcopy
+
+class Geometry:
+    """
+    This class holds the precomputed masks of a size x size board
+    on which win signs in a row win. Cells are numbered row by row.
+    """
+    def __init__(self, size, win):
+        self.size = size
+        self.win = win
+        self.cells = {(i, j): 1 << (size * i + j)
+                      for i in range(size) for j in range(size)}
+        self.full = (1 << (size * size)) - 1
+
+        # Winning lines, in the order get_status checks them on a
+        # board without a last move: diagonals, then columns and
+        # rows by index
+        self.lines = []
+        for step in ((1, 1), (1, -1)):
+            for i in range(size):
+                for j in range(size):
+                    self._add_line((i, j), step)
+        for index in range(size):
+            for start in range(size):
+                self._add_line((start, index), (1, 0))
+                self._add_line((index, start), (0, 1))
+
+        self.lines_through = {cell: [] for cell in self.cells}
+        for line in self.lines:
+            for cell, bit in self.cells.items():
+                if line & bit:
+                    self.lines_through[cell].append(line)
+
+        # Cells next to each cell, used to narrow the moves on
+        # big boards; wider neighbourhoods are made by near_within
+        self._near = {}
+        self.near = self.near_within(1)
+
+        # Bit permutations of the 8 rotations and reflections; small
+        # boards also get tables mapping a mask to its image
+        last = size - 1
+        transforms = [
+            lambda i, j: (i, j), lambda i, j: (j, last - i),
+            lambda i, j: (last - i, last - j), lambda i, j: (last - j, i),
+            lambda i, j: (i, last - j), lambda i, j: (last - i, j),
+            lambda i, j: (j, i), lambda i, j: (last - j, last - i),
+        ]
+        self.permutations = []
+        for transform in transforms:
+            permutation = [0] * (size * size)
+            for (i, j) in self.cells:
+                image = transform(i, j)
+                permutation[size * i + j] = size * image[0] + image[1]
+            self.permutations.append(permutation)
+        self.tables = None
+        if size <= 3:
+            self.tables = [[self.transform(mask, permutation)
+                            for mask in range(self.full + 1)]
+                           for permutation in self.permutations]
+
+    def near_within(self, radius):
+        """
+        This method returns, for every cell, the mask of the cells at
+        most radius rows and columns away from it (the cell included).
+        """
+        if radius < 1:
+            raise ValueError("Radius must be at least 1.")
+        if radius not in self._near:
+            near = {}
+            steps = range(-radius, radius + 1)
+            for (i, j) in self.cells:
+                mask = 0
+                for di in steps:
+                    for dj in steps:
+                        if (i + di, j + dj) in self.cells:
+                            mask |= self.cells[(i + di, j + dj)]
+                near[(i, j)] = mask
+            self._near[radius] = near
+        return self._near[radius]
+
+    def _add_line(self, start, step):
+        """
+        This method adds the line of win cells from start in the
+        direction step, if it fits on the board.
+        """
+        mask = 0
+        for k in range(self.win):
+            cell = (start[0] + k * step[0], start[1] + k * step[1])
+            if cell not in self.cells:
+                return
+            mask |= self.cells[cell]
+        self.lines.append(mask)
+
+    def transform(self, mask, permutation):
+        """
+        This method returns the image of mask under permutation.
+        """
+        image = 0
+        while mask:
+            low = mask & -mask
+            image |= 1 << permutation[low.bit_length() - 1]
+            mask ^= low
+        return image
+
+
+_GEOMETRIES = {}
+
+# Points of a finished game for the counts of move_counter
+_SCORES = {"0": 1, "x": -1}
+
+
+def geometry(size=3, win=None):
+    """
+    This function returns the (shared) Geometry of a board.
+    """
+    if win is None:
+        win = size
+    if (size, win) not in _GEOMETRIES:
+        _GEOMETRIES[(size, win)] = Geometry(size, win)
+    return _GEOMETRIES[(size, win)]
+
+
+# Masks of the classic 3x3 board
+CELLS = geometry().cells
+FULL = geometry().full
+WIN_MASKS = geometry().lines
+
 
 class Board:
     """
-    This class represents 3x3 board for
-    x o game.
+    This class represents size x size board for x o
+    game, won by win signs in a row (3x3, three in a row
+    by default). The cells of each player are kept as
+    a bitmask, see Geometry.
     """
-    def __init__(self):
+    # Outcome tallies of already evaluated positions. The table is
+    # shared by all boards, so it survives across moves and games.
+    transpositions = {}
+
+    def __init__(self, engine=None, size=3, win=None):
+        # Search engine used by make_computer_move, see search.py.
+        # None keeps the original tree-counting player.
+        self.engine = engine
         self.last = None
-        self.board = []
+        # Stack of (position, index in empty, previous last, previous
+        # status) entries that lets undo_move take the moves back.
+        self.history = []
+        # Status computed by get_status, None until it is asked for
+        self.status = None
+        self.geometry = geometry(size, win)
+        self.size = self.geometry.size
+        self.win = self.geometry.win
+        self.masks = {"x": 0, "0": 0}
         self.empty = []
         self.counter_left = 0
         self.counter_right = 0
-        for i in range(3):
-            row = []
-            for j in range(3):
-                row.append("' '")
+        # Number of positions tally visited, table hits included
+        self.tally_calls = 0
+        for i in range(size):
+            for j in range(size):
                 self.empty.append((i, j))
-            self.board.append(row)
+
+    @property
+    def board(self):
+        """
+        This property returns the board as a tuple of rows.
+        It is built from the masks on every access, so it is read
+        only: writing a cell (board.board[i][j] = "x") raises
+        TypeError. Assign the whole board, or use make_move, to
+        change the position.
+        """
+        cells = self.geometry.cells
+        board = []
+        for i in range(self.size):
+            row = []
+            for j in range(self.size):
+                if self.masks["x"] & cells[(i, j)]:
+                    row.append("x")
+                elif self.masks["0"] & cells[(i, j)]:
+                    row.append("0")
+                else:
+                    row.append("' '")
+            board.append(tuple(row))
+        return tuple(board)
+
+    @board.setter
+    def board(self, board):
+        """
+        This setter replaces the position with a list of rows.
+        The empty cells are rebuilt row by row and the move history
+        is dropped, so moves made before cannot be taken back.
+        As the last move is unknown, get_status rescans all lines.
+        """
+        self.masks = {"x": 0, "0": 0}
+        self.empty = []
+        self.history = []
+        self.last = None
+        self.status = None
+        for i in range(self.size):
+            for j in range(self.size):
+                if board[i][j] in self.masks:
+                    self.masks[board[i][j]] |= self.geometry.cells[(i, j)]
+                else:
+                    self.empty.append((i, j))
 
     def __str__(self):
         output = ''
-        for i in range(3):
+        board = self.board
+        for i in range(self.size):
             output += '['
-            for j in range(3):
-                if self.board[i][j] != "' '":
-                    output += f"\'{self.board[i][j]}\'" + ', '
+            for j in range(self.size):
+                if board[i][j] != "' '":
+                    output += f"\'{board[i][j]}\'" + ', '
                 else:
-                    output += self.board[i][j] + ', '
+                    output += board[i][j] + ', '
             output = output[:-2] +']' + "\n"
         output = output[:-1]
         return output
@@ -40,74 +225,84 @@ class Board:
     def get_status(self):
         """
         This method checks the status of this board.
+        Play stops at the first win, so only the lines through
+        the last move need to be checked. The result is kept
+        until the next move or undo.
         """
-        def column_check(board, num):
-            """
-            This function checks if there is 3 signs in
-            the same column.
-            """
-            if (board[0][num] == board[1][num] and
-                board[2][num] == board[0][num] and
-                board[0][num] != "' '"):
-                return board[0][num]
-            return 0
+        if self.status is None:
+            self.status = self._compute_status()
+        return self.status
 
-        def row_check(board, num):
-            """
-            This function checks if there is 3 signs in
-            the same row.
-            """
-            if (board[num][0] == board[num][1] and
-                board[num][2] == board[num][0] and
-                board[num][0] != "' '"):
-                return board[num][0]
-            return 0
-
-        def diagonal_check(board):
-            """
-            This function checks if there is 3 signs in
-            the same diagonal.
-            """
-            if (board[0][0] == board[1][1] and
-                board[2][2] == board[0][0] and
-                board[0][0] != "' '"):
-                return board[0][0]
-            elif (board[0][2] == board[1][1] and
-                board[0][2] == board[2][0] and
-                board[0][2] != "' '"):
-                return board[0][2]
-            return 0
-
-        check_diag = diagonal_check(self.board)
-        if check_diag:
-            return check_diag
-        for index in range(3):
-            check_col = column_check(self.board, index)
-            check_row = row_check(self.board, index)
-            if check_col:
-                return check_col
-            if check_row:
-                return check_row
-        for i in range(3):
-            for j in range(3):
-                if self.board[i][j] == "' '":
-                    return "continue"
+    def _compute_status(self):
+        """
+        This method scans the lines for the status of this board.
+        """
+        crosses = self.masks["x"]
+        noughts = self.masks["0"]
+        if self.last is not None:
+            sign, position = self.last
+            signs = self.masks[sign]
+            for mask in self.geometry.lines_through[position]:
+                if signs & mask == mask:
+                    return sign
+        else:
+            for mask in self.geometry.lines:
+                if crosses & mask == mask:
+                    return "x"
+                if noughts & mask == mask:
+                    return "0"
+        if crosses | noughts != self.geometry.full:
+            return "continue"
         return "draw"
 
     def make_move(self, position, turn):
         """
         This method changes the board by editing it.
+        It raises IndexError for an unknown sign or a cell that
+        is not empty, before anything is changed.
         """
         if turn != "x" and turn != "0":
             raise IndexError
         try:
-            self.board[position[0]][position[1]] = turn
-            self.empty.remove(position)
-            self.last = (turn, position)
-            return self
-        except IndexError & ValueError:
-            raise IndexError
+            index = self.empty.index(position)
+        except ValueError:
+            raise IndexError from None
+        self.masks[turn] |= self.geometry.cells[position]
+        del self.empty[index]
+        self.history.append((position, index, self.last, self.status))
+        self.last = (turn, position)
+        self.status = None
+        return self
 
+    def undo_move(self):
+        """
+        This method takes back the last move made by make_move.
+        """
+        position, index, last, status = self.history.pop()
+        self.masks[self.last[0]] &= ~self.geometry.cells[position]
+        self.empty.insert(index, position)
+        self.last = last
+        self.status = status
+        return self
+
+    def copy(self):
+        """
+        This method returns a cheap snapshot of the board.
+        """
+        board = Board.__new__(Board)
+        board.engine = self.engine
+        board.geometry = self.geometry
+        board.size = self.size
+        board.win = self.win
+        board.last = self.last
+        board.status = self.status
+        board.history = []
+        board.masks = dict(self.masks)
+        board.empty = self.empty[:]
+        board.counter_left = 0
+        board.counter_right = 0
+        board.tally_calls = 0
+        return board
 
     def tree_creating(self):
         """
@@ -117,27 +312,50 @@ class Board:
         tree = LinkedBinaryTree()
         tree.key = BSTNode(self)
 
+        def snapshot(node):
+            """
+            Returns a copy of node that keeps its current children.
+            """
+            if node is None:
+                return None
+            copy = LinkedBinaryTree(node.key)
+            copy.left_child = node.left_child
+            copy.right_child = node.right_child
+            return copy
+
         def recurse(node, last_sign="x"):
             """
             Recursive function for creating the tree.
+            Moves are made and taken back on self, and every
+            node keeps a snapshot of its position together with
+            its status, so inorder does not compute it again.
+            As with the deepcopy of the node this replaces, a new
+            child starts with the children node has at that moment.
+            The children a child does not replace stay in the tree
+            and are counted by move_counter.
             """
             move = ["x", "0"]
             move.remove(last_sign)
             next_sign = move[0]
-            new_node_l = 0
-            new_node_r = 0
-            if node.key.data.empty != []:
-                new_node_l = deepcopy(node)
-                new_node_l.key.data.make_move(new_node_l.key.data.empty[0], next_sign)
-                node.left_child = new_node_l
-            if len(node.key.data.empty) > 1:
-                new_node_r = deepcopy(node)
-                new_node_r.key.data.make_move(new_node_r.key.data.empty[1], next_sign)
-                node.right_child = new_node_r
-            if new_node_l and new_node_l.key.data.get_status() == "continue":
-                recurse(new_node_l, next_sign)
-            if new_node_r and new_node_r.key.data.get_status() == "continue":
-                recurse(new_node_r, next_sign)
+            positions = self.empty[:2]
+            children = []
+            for position in positions:
+                self.make_move(position, next_sign)
+                self.get_status()
+                child = LinkedBinaryTree(BSTNode(self.copy()))
+                self.undo_move()
+                child.left_child = snapshot(node.left_child)
+                child.right_child = node.right_child
+                if not children:
+                    node.left_child = child
+                else:
+                    node.right_child = child
+                children.append(child)
+            for position, child in zip(positions, children):
+                if child.key.data.get_status() == "continue":
+                    self.make_move(position, next_sign)
+                    recurse(child, next_sign)
+                    self.undo_move()
 
         recurse(tree)
         return tree
@@ -160,12 +378,13 @@ class Board:
         """
         if tree.left_child:
             self.inorder(tree.left_child, direction)
-        if tree.key.data.get_status() == '0':
+        status = tree.key.data.get_status()
+        if status == '0':
             if direction == "l":
                 self.counter_left += 1
             else:
                 self.counter_right += 1
-        if tree.key.data.get_status() == 'x':
+        if status == 'x':
             if direction == "l":
                 self.counter_left -= 1
             else:
@@ -174,12 +393,87 @@ class Board:
             self.inorder(tree.right_child, direction)
         return
     
+    def key(self):
+        """
+        This method returns a hashable encoding of the position.
+        """
+        return (self.size, self.win, self.masks["x"], self.masks["0"])
+
+    def canonical_key(self):
+        """
+        This method returns the same key for all positions that are
+        rotations or reflections of each other.
+        """
+        crosses = self.masks["x"]
+        noughts = self.masks["0"]
+        geometry = self.geometry
+        if geometry.tables is not None:
+            images = min((table[crosses], table[noughts])
+                         for table in geometry.tables)
+        else:
+            images = min((geometry.transform(crosses, permutation),
+                          geometry.transform(noughts, permutation))
+                         for permutation in geometry.permutations)
+        return (self.size, self.win) + images
+
+    def tally(self, next_sign, left=0, right=0):
+        """
+        This method returns computer wins minus player wins over
+        the game tree below this board (itself included), counted
+        the same way as move_counter does, with next_sign to move.
+        left and right are the counts of the children the node of
+        this board starts with in tree_creating; the ones it does
+        not replace are counted too.
+        Results are stored in the transposition table.
+        """
+        self.tally_calls += 1
+        key = (self.key(), next_sign, left, right)
+        if key in Board.transpositions:
+            return Board.transpositions[key]
+        status = self.get_status()
+        result = _SCORES.get(status, 0)
+        if status != "continue":
+            result += left + right
+        else:
+            after_sign = "x" if next_sign == "0" else "0"
+            positions = self.empty[:2]
+            self.make_move(positions[0], next_sign)
+            first = _SCORES.get(self.get_status(), 0)
+            result += self.tally(after_sign, left, right)
+            self.undo_move()
+            if len(positions) > 1:
+                self.make_move(positions[1], next_sign)
+                result += self.tally(after_sign, first + left + right,
+                                     right)
+                self.undo_move()
+            else:
+                result += right
+        Board.transpositions[key] = result
+        return result
+
     def make_computer_move(self):
         """
         This method changes the board by computer move.
+        If the board has a search engine, the move it chooses is made
+        and its SearchResult returned. Otherwise the counts that
+        move_counter gets from the full game tree are taken from the
+        transposition table.
         """
-        result_tree = self.tree_creating()
-        win_lose = self.move_counter(result_tree)
+        if self.engine is not None:
+            result = self.engine.search(self, "0")
+            self.make_move(result.move, "0")
+            return result
+        tallies = []
+        first = 0
+        for position in self.empty[:2]:
+            self.make_move(position, "0")
+            tallies.append(self.tally("x", first))
+            first = _SCORES.get(self.get_status(), 0)
+            self.undo_move()
+        self.counter_left += tallies[0]
+        if len(tallies) > 1:
+            self.counter_right += tallies[1]
+        win_lose = (self.counter_left, self.counter_right)
         if win_lose[0] >= win_lose[1]:
             self.make_move(self.empty[0], "0")
         else:
@@ -0,0 +1,119 @@
+"""
+This module contains the opening book: a table with the best
+reply for every position that can be reached in a game.
+
+Run it as a script to (re)build book.bin.
+"""
+
+import os
+from array import array
+
+from board import Board, CELLS, geometry
+from search import AlphaBetaEngine, SearchResult, other
+
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "book.bin")
+
+# Number of possible encodings of a 3x3 board
+SIZE = 3 ** 9
+
+# Value of a position that is not in the book
+MISSING = 255
+
+# Cells in the order of their book number
+ORDER = sorted(CELLS)
+
+
+def encode(board):
+    """
+    This function returns the index of board in the book: the
+    cells read as a base 3 number (0 empty, 1 cross, 2 nought).
+    """
+    index = 0
+    for cell in reversed(ORDER):
+        index *= 3
+        if board.masks["x"] & CELLS[cell]:
+            index += 1
+        elif board.masks["0"] & CELLS[cell]:
+            index += 2
+    return index
+
+
+def to_move(board):
+    """
+    This function returns the sign that moves next, crosses first.
+    """
+    if bin(board.masks["x"]).count("1") > bin(board.masks["0"]).count("1"):
+        return "0"
+    return "x"
+
+
+def build_book():
+    """
+    This function visits every position reachable from the empty
+    board and returns the table of best replies.
+    """
+    table = array("B", [MISSING]) * SIZE
+    engine = AlphaBetaEngine()
+    board = Board()
+    seen = set()
+
+    def visit(turn):
+        index = encode(board)
+        if index in seen or board.get_status() != "continue":
+            return
+        seen.add(index)
+        table[index] = ORDER.index(engine.search(board, turn).move)
+        for move in list(board.empty):
+            board.make_move(move, turn)
+            visit(other(turn))
+            board.undo_move()
+
+    visit("x")
+    return table
+
+
+def save_book(table, path=BOOK_PATH):
+    """
+    This function writes the table to path.
+    """
+    with open(path, "wb") as file:
+        table.tofile(file)
+
+
+class BookEngine:
+    """
+    This class answers from the opening book in O(1) and asks
+    the fallback engine about positions that are not in it.
+    """
+    def __init__(self, table, fallback=None):
+        self.table = table
+        if fallback is None:
+            fallback = AlphaBetaEngine()
+        self.fallback = fallback
+
+    @classmethod
+    def load(cls, path=BOOK_PATH, fallback=None):
+        """
+        This method reads the book from path.
+        """
+        table = array("B")
+        with open(path, "rb") as file:
+            table.fromfile(file, SIZE)
+        return cls(table, fallback)
+
+    def search(self, board, turn):
+        """
+        This method returns the book move for turn on board.
+        """
+        if board.geometry is geometry() and turn == to_move(board):
+            value = self.table[encode(board)]
+            if value != MISSING:
+                return SearchResult(ORDER[value], None, 0)
+        return self.fallback.search(board, turn)
+
+
+if __name__ == "__main__":
+    book = build_book()
+    save_book(book)
+    print(f"{SIZE - book.count(MISSING)} positions written to {BOOK_PATH}")
@@ -7,6 +7,8 @@ class BSTNode(object):
     """
     Represents a node for a linked binary search tree.
     """
+    __slots__ = ("data", "left", "right")
+
     def __init__(self, data, left = None, right = None):
         self.data = data
         self.left = left
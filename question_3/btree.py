@@ -7,6 +7,8 @@ class LinkedBinaryTree:
     This class represents linked binary tree. It's without
     methods because game doesn't require them.
     """
+    __slots__ = ("key", "left_child", "right_child")
+
     def __init__(self, root=None):
         self.key = root
         self.left_child = None
@@ -2,7 +2,9 @@
 This is main module of x o game.
 """
 
+import os
 from board import Board
+from book import BookEngine, BOOK_PATH
 from blessed import Terminal
 
 def game():
@@ -10,7 +12,10 @@ def game():
     This is the main function, which starts the game.
     """
     terminal = Terminal()
-    board = Board()
+    engine = None
+    if os.path.exists(BOOK_PATH):
+        engine = BookEngine.load()
+    board = Board(engine)
     while board.get_status() == "continue":
         move = status(board, terminal)
         try:
@@ -0,0 +1,222 @@
+"""
+This module contains a Monte Carlo Tree Search engine for the
+computer player.
+"""
+
+import random
+import time
+from math import log, sqrt
+
+from btree import LinkedBinaryTree
+from search import SearchResult, other
+
+
+class MCTSNode(LinkedBinaryTree):
+    """
+    This class represents a node of the search tree. The tree is kept
+    in left-child / right-sibling form: key is the move that leads to
+    the node, left_child is its first child and right_child is its
+    next sibling.
+    """
+    __slots__ = ("turn", "visits", "value", "untried")
+
+    def __init__(self, move=None, turn=None):
+        LinkedBinaryTree.__init__(self, move)
+        # Player who made the move, and the games won by that player
+        # (a draw counts as half) out of the visits
+        self.turn = turn
+        self.visits = 0
+        self.value = 0.0
+        # Moves not expanded yet, filled on the first expansion
+        self.untried = None
+
+    def children(self):
+        """
+        This method yields the children of the node.
+        """
+        child = self.left_child
+        while child is not None:
+            yield child
+            child = child.right_child
+
+    def add_child(self, child):
+        """
+        This method makes child the first child of the node.
+        """
+        child.right_child = self.left_child
+        self.left_child = child
+
+
+class MCTSEngine:
+    """
+    This class searches with UCT: each playout walks down the tree by
+    the UCB1 formula, expands one new node, finishes the game with
+    random moves and updates the statistics on the way back.
+
+    A search runs playouts playouts, or stops earlier when budget
+    seconds (if given) have passed. The tree grows to at most
+    max_nodes nodes. After the opponent replies, the subtree under
+    that reply is kept for the next search. With a radius, new nodes
+    are only made for cells at most radius rows and columns away from
+    occupied ones.
+    """
+    def __init__(self, playouts=1000, budget=None, exploration=sqrt(2),
+                 max_nodes=100000, radius=None, seed=None):
+        self.playouts = playouts
+        self.budget = budget
+        self.exploration = exploration
+        self.max_nodes = max_nodes
+        self.radius = radius
+        self.rng = random.Random(seed)
+        self.root = None
+        self.root_masks = None
+        self.cells = None
+        self.size = 0
+
+    def search(self, board, turn):
+        """
+        This method returns the most visited move for turn on board.
+        """
+        self._reuse(board, turn)
+        deadline = None
+        if self.budget is not None:
+            deadline = time.perf_counter() + self.budget
+        playouts = 0
+        while playouts < self.playouts:
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            self._playout(board)
+            playouts += 1
+
+        best = None
+        for child in self.root.children():
+            if best is None or child.visits > best.visits:
+                best = child
+        if best is None:
+            # No playout finished: play any candidate move
+            return SearchResult(self._candidates(board)[0], None, playouts)
+        return SearchResult(best.key, best.value / best.visits, playouts)
+
+    def _reuse(self, board, turn):
+        """
+        This method moves the root to the node of the position on
+        board if it is at most two moves below the old root, or
+        starts a new tree otherwise.
+        """
+        masks = dict(board.masks)
+        found = None
+        if self.root is not None and self.root.turn == other(turn) and \
+                self.cells is board.geometry.cells:
+            if masks == self.root_masks:
+                found = self.root
+            else:
+                found = self._find(masks)
+        self.cells = board.geometry.cells
+        if found is None:
+            found = MCTSNode(turn=other(turn))
+        found.right_child = None
+        self.root = found
+        self.root_masks = masks
+        self.size = self._count(found)
+
+    def _find(self, masks):
+        """
+        This method returns the grandchild of the root whose
+        position is masks, or None.
+        """
+        for child in self.root.children():
+            child_masks = dict(self.root_masks)
+            child_masks[child.turn] |= self.cells[child.key]
+            for grandchild in child.children():
+                found_masks = dict(child_masks)
+                found_masks[grandchild.turn] |= self.cells[grandchild.key]
+                if found_masks == masks:
+                    return grandchild
+        return None
+
+    def _count(self, root):
+        """
+        This method returns the number of nodes under root.
+        """
+        count = 0
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            count += 1
+            stack.extend(node.children())
+        return count
+
+    def _candidates(self, board):
+        """
+        This method returns the moves considered for new nodes.
+        """
+        occupied = board.masks["x"] | board.masks["0"]
+        if self.radius is None or not occupied:
+            return list(board.empty)
+        near = board.geometry.near_within(self.radius)
+        return [move for move in board.empty if near[move] & occupied]
+
+    def _playout(self, board):
+        """
+        This method runs one select-expand-simulate-update round.
+        The board is left as it was.
+        """
+        made = 0
+        node = self.root
+        path = [node]
+        status = board.get_status()
+
+        # Selection
+        while status == "continue" and node.untried == [] \
+                and node.left_child is not None:
+            node = self._select(node)
+            board.make_move(node.key, node.turn)
+            made += 1
+            path.append(node)
+            status = board.get_status()
+
+        # Expansion
+        if status == "continue" and self.size < self.max_nodes:
+            if node.untried is None:
+                node.untried = self._candidates(board)
+                self.rng.shuffle(node.untried)
+            if node.untried:
+                child = MCTSNode(node.untried.pop(), other(node.turn))
+                node.add_child(child)
+                self.size += 1
+                board.make_move(child.key, child.turn)
+                made += 1
+                path.append(child)
+                node = child
+                status = board.get_status()
+
+        # Simulation
+        turn = other(node.turn)
+        while status == "continue":
+            board.make_move(self.rng.choice(board.empty), turn)
+            made += 1
+            turn = other(turn)
+            status = board.get_status()
+        for _ in range(made):
+            board.undo_move()
+
+        # Update
+        for visited in path:
+            visited.visits += 1
+            if status == visited.turn:
+                visited.value += 1
+            elif status == "draw":
+                visited.value += 0.5
+
+    def _select(self, node):
+        """
+        This method returns the child of node with the best UCB1 score.
+        """
+        scale = self.exploration * sqrt(log(node.visits))
+        best = None
+        best_score = None
+        for child in node.children():
+            score = child.value / child.visits + scale / sqrt(child.visits)
+            if best is None or score > best_score:
+                best, best_score = child, score
+        return best
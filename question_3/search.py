@@ -0,0 +1,424 @@
+"""
+This module contains search engines for the computer player.
+An engine has a search(board, turn) method that returns
+a SearchResult without changing the board.
+"""
+
+import os
+import time
+from pickle import PicklingError
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from board import Board
+
+SearchResult = namedtuple("SearchResult", ["move", "score", "nodes"])
+
+# Score of a won game before the number of moves is subtracted,
+# so that quicker wins score higher. Heuristic scores stay below it.
+WIN = 10 ** 9
+
+# Kinds of transposition table entries
+EXACT, LOWER, UPPER = range(3)
+
+# Remaining depth stored for values searched to the end of the game
+FULL_DEPTH = 10 ** 6
+
+
+class SearchTimeout(Exception):
+    """
+    This exception stops a search whose deadline has passed.
+    """
+
+
+def other(turn):
+    """
+    This function returns the sign of the opponent of turn.
+    """
+    return "x" if turn == "0" else "0"
+
+
+class TreeCountingEngine:
+    """
+    This class wraps the original player: it builds the binary tree
+    of tree_creating and chooses between empty[0] and empty[1] by
+    the win/lose counts of move_counter. Like that player, it can
+    only play noughts.
+    """
+    def search(self, board, turn):
+        """
+        This method returns the move of the tree-counting player.
+        """
+        if turn != "0":
+            raise ValueError("The tree-counting player plays noughts.")
+        tree = board.tree_creating()
+        counter = board.copy()
+        left, right = counter.move_counter(tree)
+        nodes = 0
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            nodes += 1
+            for child in (node.left_child, node.right_child):
+                if child is not None:
+                    stack.append(child)
+        if left >= right:
+            return SearchResult(board.empty[0], left, nodes)
+        return SearchResult(board.empty[1], right, nodes)
+
+
+def line_heuristic(board, turn):
+    """
+    This function scores an unfinished game for turn: every line
+    that only one player occupies is worth 10 ** (signs in it),
+    for that player.
+    """
+    mine = board.masks[turn]
+    theirs = board.masks[other(turn)]
+    score = 0
+    for line in board.geometry.lines:
+        if line & theirs == 0:
+            count = bin(line & mine).count("1")
+            if count:
+                score += 10 ** count
+        elif line & mine == 0:
+            score -= 10 ** bin(line & theirs).count("1")
+    return max(-WIN // 2, min(WIN // 2, score))
+
+
+class AlphaBetaEngine:
+    """
+    This class is a minimax (negamax) search with alpha-beta
+    pruning over all legal moves. Moves that win at once are tried
+    first, then the cells on the most winning lines. Searched
+    positions are kept in a transposition table keyed by
+    Board.canonical_key, so symmetric positions share their entries.
+
+    With a depth, the search stops after that many moves and scores
+    the position with heuristic. With a radius, only the empty cells
+    at most radius rows and columns away from an occupied one are
+    searched, which keeps big boards responsive.
+    """
+    def __init__(self, depth=None, heuristic=line_heuristic, radius=None):
+        self.depth = depth
+        self.heuristic = heuristic
+        self.radius = radius
+        self.table = {}
+        self.nodes = 0
+        # time.perf_counter() value after which the search raises
+        # SearchTimeout, or None for no limit
+        self.deadline = None
+        # Best root move of the current search so far, kept when the
+        # search is stopped by the deadline
+        self.best = None
+
+    def search(self, board, turn, first=None):
+        """
+        This method returns the best move for turn on board.
+        The move first, if given, is searched before the others.
+        """
+        self.nodes = 0
+        self.best = None
+        depth = FULL_DEPTH if self.depth is None else self.depth
+        alpha = -WIN - 1
+        best = None
+        moves = self.ordered_moves(board, turn)
+        if first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        for move in moves:
+            board.make_move(move, turn)
+            score = -self._negamax(board, other(turn), -WIN - 1, -alpha,
+                                   depth - 1)
+            board.undo_move()
+            if best is None or score > alpha:
+                alpha = score
+                best = move
+                self.best = SearchResult(best, alpha, self.nodes)
+        return SearchResult(best, alpha, self.nodes)
+
+    def ordered_moves(self, board, turn):
+        """
+        This method returns the legal moves, most promising first.
+        """
+        geometry = board.geometry
+        moves = board.empty
+        occupied = board.masks["x"] | board.masks["0"]
+        if self.radius is not None and occupied:
+            near = geometry.near_within(self.radius)
+            moves = [move for move in moves if near[move] & occupied]
+
+        def rank(move):
+            board.make_move(move, turn)
+            wins = board.get_status() == turn
+            board.undo_move()
+            return (not wins, -len(geometry.lines_through[move]))
+
+        return sorted(moves, key=rank)
+
+    def evaluate(self, board, turn):
+        """
+        This method scores a finished game for turn, or returns
+        None if the game goes on.
+        """
+        status = board.get_status()
+        if status == "continue":
+            return None
+        if status == "draw":
+            return 0
+        filled = len(board.geometry.cells) - len(board.empty)
+        if status == turn:
+            return WIN - filled
+        return filled - WIN
+
+    def _negamax(self, board, turn, alpha, beta, depth):
+        """
+        This method returns the score of board for turn, the
+        player to move, within the window (alpha, beta), searching
+        depth more moves.
+        """
+        self.nodes += 1
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout
+        score = self.evaluate(board, turn)
+        if score is not None:
+            return score
+        if depth <= 0:
+            return self.heuristic(board, turn)
+        key = (board.canonical_key(), turn)
+        entry = self.table.get(key)
+        if entry is not None and entry[2] >= depth:
+            value, kind = entry[0], entry[1]
+            if kind == EXACT:
+                return value
+            if kind == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+        original_alpha = alpha
+        best = -WIN - 1
+        for move in self.ordered_moves(board, turn):
+            board.make_move(move, turn)
+            score = -self._negamax(board, other(turn), -beta, -alpha,
+                                   depth - 1)
+            board.undo_move()
+            if score > best:
+                best = score
+            if best > alpha:
+                alpha = best
+            if alpha >= beta:
+                break
+        if best <= original_alpha:
+            kind = UPPER
+        elif best >= beta:
+            kind = LOWER
+        else:
+            kind = EXACT
+        self.table[key] = (best, kind, depth)
+        return best
+
+
+class IterativeDeepeningEngine:
+    """
+    This class searches with engine to depth 1, 2, 3... until budget
+    seconds have passed, and returns the move of the deepest search
+    that finished. The budget applies from the start: if even depth 1
+    does not finish, its best move so far is returned, or the first
+    of the ordered moves if no move was scored yet.
+    Each search starts with the best move of the previous one.
+    """
+    def __init__(self, budget=0.05, engine=None):
+        if engine is None:
+            engine = AlphaBetaEngine()
+        self.budget = budget
+        self.engine = engine
+        self.depth_reached = 0
+
+    def search(self, board, turn):
+        """
+        This method returns the best move for turn on board found
+        within the time budget.
+        """
+        deadline = time.perf_counter() + self.budget
+        self.depth_reached = 0
+        engine = self.engine
+        saved_depth = engine.depth
+        moves_made = len(board.history)
+        result = None
+        nodes = 0
+        depth = 1
+        engine.deadline = deadline
+        try:
+            while True:
+                engine.depth = depth
+                first = None if result is None else result.move
+                try:
+                    current = engine.search(board, turn, first)
+                except SearchTimeout:
+                    nodes += engine.nodes
+                    # Take back the moves of the interrupted search
+                    while len(board.history) > moves_made:
+                        board.undo_move()
+                    if result is None:
+                        result = engine.best
+                    if result is None:
+                        move = engine.ordered_moves(board, turn)[0]
+                        result = SearchResult(move, None, 0)
+                    break
+                nodes += engine.nodes
+                result = current
+                self.depth_reached = depth
+                if depth >= len(board.empty) or abs(result.score) > WIN // 2:
+                    break
+                depth += 1
+        finally:
+            engine.deadline = None
+            engine.depth = saved_depth
+        return SearchResult(result.move, result.score, nodes)
+
+
+def _restore(state):
+    """
+    This function rebuilds a board from the state made by
+    ParallelEngine, in a worker process.
+    """
+    size, win, masks, empty, last = state
+    board = Board(size=size, win=win)
+    board.masks = dict(masks)
+    board.empty = list(empty)
+    board.last = last
+    return board
+
+
+class _LoggedTable(dict):
+    """
+    This class is a transposition table that remembers the keys
+    written through table[key] = entry, so a worker process can send
+    back only the entries it added.
+    """
+    def __init__(self, entries=()):
+        dict.__init__(self, entries)
+        self.written = set()
+
+    def __setitem__(self, key, entry):
+        dict.__setitem__(self, key, entry)
+        self.written.add(key)
+
+
+# Engine of a ParallelEngine worker process, set by _start_worker
+_worker_engine = None
+
+
+def _start_worker(engine):
+    """
+    This function keeps the engine (and its table) a worker process
+    gets once, when the pool starts.
+    """
+    global _worker_engine
+    engine.table = _LoggedTable(engine.table)
+    _worker_engine = engine
+
+
+def _search_move(state, move, turn, depth, updates):
+    """
+    This function scores one root move in a worker process. The
+    entries other workers found in the last search (updates) are
+    added to the worker's table first. It returns the move, its
+    score, the node count and the table entries the search wrote.
+    """
+    engine = _worker_engine
+    # dict.update does not go through __setitem__, so the updates
+    # are not sent back
+    engine.table.update(updates)
+    engine.table.written = set()
+    engine.nodes = 0
+    board = _restore(state)
+    board.make_move(move, turn)
+    score = -engine._negamax(board, other(turn), -WIN - 1, WIN + 1,
+                             depth - 1)
+    table = engine.table
+    return move, score, engine.nodes, {key: table[key]
+                                       for key in table.written}
+
+
+class ParallelEngine:
+    """
+    This class splits the root moves of an AlphaBetaEngine across a
+    process pool of workers processes (all cores by default). Each
+    worker gets the engine and its table once, when the pool starts.
+    After that a worker only returns the entries it added, which are
+    merged into the engine's table and passed to all workers with
+    the next search. With one worker, or if no pool can be started
+    or the engine cannot be sent to it, the search runs serially.
+    """
+    def __init__(self, engine=None, workers=None):
+        if engine is None:
+            engine = AlphaBetaEngine()
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.engine = engine
+        self.workers = workers
+        self._pool = None
+        # Entries merged in the last search, not yet sent to workers
+        self._updates = {}
+
+    def search(self, board, turn):
+        """
+        This method returns the best move for turn on board.
+        """
+        moves = self.engine.ordered_moves(board, turn)
+        if self.workers <= 1 or len(moves) < 2:
+            return self.engine.search(board, turn)
+        state = (board.size, board.win, board.masks, board.empty,
+                 board.last)
+        depth = FULL_DEPTH if self.engine.depth is None else self.engine.depth
+        try:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    self.workers, initializer=_start_worker,
+                    initargs=(self.engine,))
+                self._updates = {}
+            futures = [self._pool.submit(_search_move, state, move, turn,
+                                         depth, self._updates)
+                       for move in moves]
+            results = [future.result() for future in futures]
+        except (OSError, NotImplementedError, BrokenProcessPool,
+                PicklingError, AttributeError):
+            # AttributeError is what pickle raises for a nested
+            # function, e.g. a local heuristic, on a spawned pool
+            self.close()
+            self.workers = 1
+            return self.engine.search(board, turn)
+
+        self._updates = {}
+        best = None
+        best_score = None
+        nodes = 0
+        for move, score, move_nodes, table in results:
+            nodes += move_nodes
+            self.merge(table)
+            if best is None or score > best_score:
+                best, best_score = move, score
+        return SearchResult(best, best_score, nodes)
+
+    def merge(self, table):
+        """
+        This method adds the entries of table to the engine's table,
+        keeping the deeper entry of a position found in both.
+        """
+        own = self.engine.table
+        for key, entry in table.items():
+            if key not in own or own[key][2] < entry[2]:
+                own[key] = entry
+                self._updates[key] = entry
+
+    def close(self):
+        """
+        This method shuts the process pool down.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
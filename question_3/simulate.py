@@ -0,0 +1,220 @@
+"""
+This module plays x o games between computer players without
+a terminal and reports how fast and how well they play.
+
+Usage: python simulate.py --games 1000 --x random --o alphabeta
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from math import ceil
+
+from board import Board
+from book import BookEngine
+from mcts import MCTSEngine
+from search import (AlphaBetaEngine, IterativeDeepeningEngine,
+                    TreeCountingEngine, other)
+
+
+class RandomPlayer:
+    """
+    This class plays a random empty cell. It searches nothing, so it
+    reports None instead of a node count.
+    """
+    def __init__(self, rng):
+        self.rng = rng
+
+    def choose(self, board, turn):
+        """
+        This method returns the move and the number of searched nodes.
+        """
+        return self.rng.choice(board.empty), None
+
+
+class TableCountingPlayer:
+    """
+    This class plays Board.make_computer_move without an engine,
+    i.e. the tree-counting player answered from the transposition
+    table. Like that method, it can only play noughts. Its node count
+    is the number of positions tally visited for the move, the ones
+    answered from the table included.
+    """
+    def choose(self, board, turn):
+        """
+        This method returns the move and the number of searched nodes.
+        """
+        if turn != "0":
+            raise ValueError("The tree-counting player plays noughts.")
+        known = board.tally_calls
+        board.counter_left = 0
+        board.counter_right = 0
+        board.make_computer_move()
+        move = board.last[1]
+        board.undo_move()
+        return move, board.tally_calls - known
+
+
+class EnginePlayer:
+    """
+    This class plays the moves of a search engine.
+    """
+    def __init__(self, engine):
+        self.engine = engine
+
+    def choose(self, board, turn):
+        """
+        This method returns the move and the number of searched nodes.
+        """
+        result = self.engine.search(board, turn)
+        return result.move, result.nodes
+
+
+def make_player(name, rng):
+    """
+    This function returns a new player by its name.
+    """
+    if name == "random":
+        return RandomPlayer(rng)
+    if name == "tree":
+        return EnginePlayer(TreeCountingEngine())
+    if name == "table":
+        return TableCountingPlayer()
+    if name == "alphabeta":
+        return EnginePlayer(AlphaBetaEngine())
+    if name == "deepening":
+        return EnginePlayer(IterativeDeepeningEngine())
+    if name == "mcts":
+        return EnginePlayer(MCTSEngine(seed=rng.random()))
+    if name == "book":
+        return EnginePlayer(BookEngine.load())
+    raise ValueError(f"Unknown player: {name}")
+
+
+PLAYERS = ("random", "tree", "table", "alphabeta", "deepening", "mcts",
+           "book")
+
+
+def play_games(games, x_name, o_name, seed, size=3, win=None):
+    """
+    This function plays games games and returns the outcomes, the
+    move latencies and node counts of each player and the time spent.
+    The node count of a player that does not count nodes is None.
+    """
+    rng = random.Random(seed)
+    players = {"x": make_player(x_name, rng), "0": make_player(o_name, rng)}
+    stats = {
+        "outcomes": {"x": 0, "0": 0, "draw": 0},
+        "latencies": {"x": [], "0": []},
+        "nodes": {"x": 0, "0": 0},
+    }
+    start = time.perf_counter()
+    for _ in range(games):
+        board = Board(size=size, win=win)
+        turn = "x"
+        while board.get_status() == "continue":
+            move_start = time.perf_counter()
+            move, nodes = players[turn].choose(board, turn)
+            stats["latencies"][turn].append(time.perf_counter() - move_start)
+            if nodes is None:
+                stats["nodes"][turn] = None
+            elif stats["nodes"][turn] is not None:
+                stats["nodes"][turn] += nodes
+            board.make_move(move, turn)
+            turn = other(turn)
+        stats["outcomes"][board.get_status()] += 1
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+def _play_chunk(args):
+    """
+    This function unpacks the arguments of play_games for a pool.
+    """
+    return play_games(*args)
+
+
+def percentile(values, fraction):
+    """
+    This function returns the nearest-rank percentile of values.
+    """
+    ordered = sorted(values)
+    return ordered[max(0, ceil(fraction * len(ordered)) - 1)]
+
+
+def simulate(games, x_name, o_name, seed=0, size=3, win=None,
+             processes=1):
+    """
+    This function plays games games, split across processes worker
+    processes (each with its own seed), and returns a report with
+    games/sec, nodes/sec, per-move latency percentiles and outcomes.
+    """
+    chunks = max(1, min(processes, games))
+    sizes = [games // chunks + (index < games % chunks)
+             for index in range(chunks)]
+    jobs = [(count, x_name, o_name, seed + index, size, win)
+            for index, count in enumerate(sizes)]
+    start = time.perf_counter()
+    if chunks == 1:
+        results = [play_games(*jobs[0])]
+    else:
+        with ProcessPoolExecutor(chunks) as pool:
+            results = list(pool.map(_play_chunk, jobs))
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "config": {"games": games, "x": x_name, "0": o_name, "seed": seed,
+                   "size": size, "win": win, "processes": chunks},
+        "seconds": elapsed,
+        "games_per_second": games / elapsed if elapsed else None,
+        "outcomes": {"x": 0, "0": 0, "draw": 0},
+        "players": {},
+    }
+    for result in results:
+        for outcome, count in result["outcomes"].items():
+            report["outcomes"][outcome] += count
+    for turn, name in (("x", x_name), ("0", o_name)):
+        latencies = [value for result in results
+                     for value in result["latencies"][turn]]
+        counts = [result["nodes"][turn] for result in results]
+        nodes = None if None in counts else sum(counts)
+        thinking = sum(latencies)
+        player = {"name": name, "moves": len(latencies), "nodes": nodes,
+                  "nodes_per_second": nodes / thinking
+                  if nodes is not None and thinking else None}
+        if latencies:
+            player.update({
+                "latency_mean": statistics.mean(latencies),
+                "latency_p50": percentile(latencies, 0.50),
+                "latency_p95": percentile(latencies, 0.95),
+                "latency_p99": percentile(latencies, 0.99),
+                "latency_max": max(latencies),
+            })
+        report["players"][turn] = player
+    return report
+
+
+def main(argv=None):
+    """
+    This function parses the command line and prints the report.
+    """
+    parser = argparse.ArgumentParser(
+        description="Play x o games between computer players.")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--x", default="random", choices=PLAYERS)
+    parser.add_argument("--o", default="table", choices=PLAYERS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--win", type=int, default=None)
+    parser.add_argument("--processes", type=int, default=1)
+    args = parser.parse_args(argv)
+    report = simulate(args.games, args.x, args.o, args.seed, args.size,
+                      args.win, args.processes)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()